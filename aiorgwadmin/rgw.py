@@ -1,19 +1,40 @@
-import json
+import asyncio
+import base64
+import functools
+import hashlib
+import hmac
 import logging
-import random
+import re
+import secrets
 import string
 import time
-from collections.abc import Sequence
+import types
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator, Sequence
+from contextlib import aclosing, asynccontextmanager
 from datetime import datetime
+from email.utils import formatdate
 from http import HTTPStatus
-from io import StringIO
 from ssl import SSLContext
 from typing import Any, ClassVar, Final
-from urllib.parse import quote
+from urllib.parse import quote, unquote, urlencode
 
-from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector
-from awsauth import S3Auth
-from requests import Request
+from aiohttp import (
+    BaseConnector, ClientResponse, ClientSession, ClientTimeout, TCPConnector,
+)
+from multidict import CIMultiDict
+
+try:
+    # orjson is an optional, faster drop-in for decoding responses
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads  # type: ignore[assignment]
+
+try:
+    # ijson is optional and lets metadata listings be decoded as they stream in
+    import ijson
+except ImportError:
+    ijson = None
 
 from .exceptions import (
     RGWAdminException, AccessDenied, UserExists,
@@ -28,9 +49,57 @@ from .exceptions import (
 
 log: Final = logging.getLogger(__name__)
 LETTERS: Final = string.ascii_letters
+RADOS_DATESTRING: Final = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})\.\d{1,6}Z')
+
+# query string arguments that are part of the resource in S3 v2 signatures
+S3_SUBRESOURCES: Final = frozenset({
+    'acl', 'location', 'logging', 'partNumber', 'policy', 'requestPayment',
+    'torrent', 'versioning', 'versionId', 'versions', 'website', 'uploads',
+    'uploadId', 'response-content-type', 'response-content-language',
+    'response-expires', 'response-cache-control', 'delete', 'lifecycle',
+    'response-content-disposition', 'response-content-encoding', 'tagging',
+    'notification', 'cors',
+})
+
+# how booleans are spelled on the wire, indexed by the bool itself
+_BOOL: Final = ('false', 'true')
+
+# map the error Code returned by the admin API to the exception raised for it
+_ERROR_MAP: Final[dict[str, type[RGWAdminException]]] = {
+    e.__name__: e for e in (
+        AccessDenied, UserExists, InvalidAccessKey,
+        InvalidKeyType, InvalidSecretKey, KeyExists, EmailExists,
+        SubuserExists, InvalidAccess, InvalidArgument,
+        IndexRepairFailed, BucketNotEmpty, ObjectRemovalFailed,
+        BucketUnlinkFailed, BucketLinkFailed, NoSuchObject,
+        InvalidCap, NoSuchCap, NoSuchUser, NoSuchBucket,
+        NoSuchKey, IncompleteBody, BucketAlreadyExists,
+        InternalError,
+    )
+}
+
+
+def _qs(params: dict[str, Any]) -> str:
+    '''Return an encoded query string, skipping parameters that are None'''
+    return urlencode(
+        {k: _BOOL[v] if isinstance(v, bool) else v
+         for k, v in params.items() if v is not None},
+        quote_via=quote,
+    )
 
 
 class RGWAdmin:
+    __slots__ = (
+        '_access_key', '_secret_key', '_server', '_admin', '_response',
+        '_ssl_context', '_verify', '_ssl', '_protocol', '_base_url', '_admin_prefix',
+        '_urls', '_client_timeout', '_skip_auto_headers', '_request_options',
+        '_pool_connections',
+        '_pool_size', '_keepalive_timeout', '_connector', '_session',
+        '_owns_session', '_session_lock', '_session_loop',
+        '_signing_key', '_etag_cache_size', '_etag_cache',
+    )
+
     _access_key: str
     _secret_key: str
     _server: str
@@ -38,13 +107,30 @@ class RGWAdmin:
     _response: str
     _ssl_context: SSLContext | None
     _verify: bool
+    _ssl: SSLContext | bool
     _protocol: str
-    _timeout: float | None
+    _base_url: str
+    _admin_prefix: str
+    _urls: types.SimpleNamespace
+    _client_timeout: ClientTimeout | None
+    _skip_auto_headers: list[str]
+    _request_options: dict[str, Any]
+    _pool_connections: bool
+    _pool_size: int
+    _keepalive_timeout: float
+    _connector: BaseConnector | None
     _session: ClientSession | None
+    _owns_session: bool
+    _session_lock: asyncio.Lock
+    _session_loop: asyncio.AbstractEventLoop | None
+    _signing_key: bytes
+    _etag_cache_size: int
+    _etag_cache: OrderedDict[str, tuple[str, bytes]]
 
     connection: ClassVar['RGWAdmin']
 
-    metadata_types: ClassVar[list[str]] = ['user', 'bucket', 'bucket.instance']
+    metadata_types: ClassVar[frozenset[str]] = frozenset(
+        {'user', 'bucket', 'bucket.instance'})
 
     def __init__(
         self,
@@ -57,30 +143,78 @@ class RGWAdmin:
         secure: bool = True,
         verify: bool = True,
         timeout: float | None = None,
-        pool_connections: bool = False,
+        pool_connections: bool = True,
+        pool_size: int = 100,
+        keepalive_timeout: float = 15,
+        etag_cache_size: int = 0,
+        session: ClientSession | None = None,
+        connector: BaseConnector | None = None,
     ) -> None:
         self._access_key = access_key
         self._secret_key = secret_key
         self._server = server
         self._admin = admin
         self._response = response
-        self._session = None
 
         # ssl support
         self._ssl_context = ssl_context
         self._verify = verify
+        self._ssl = ssl_context if ssl_context else verify
         if secure:
             self._protocol = 'https'
         else:
             self._protocol = 'http'
+        self._base_url = f'{self._protocol}://{self._server}'
+        self._admin_prefix = f'/{self._admin}'
+
+        # the admin endpoints with the fixed format parameter already applied
+        admin, fmt = self._admin_prefix, self._response
+        self._urls = types.SimpleNamespace(
+            user=f'{admin}/user?format={fmt}',
+            user_quota=f'{admin}/user?quota&format={fmt}',
+            user_key=f'{admin}/user?key&format={fmt}',
+            user_caps=f'{admin}/user?caps&format={fmt}',
+            user_subuser=f'{admin}/user?subuser&format={fmt}',
+            bucket=f'{admin}/bucket?format={fmt}',
+            bucket_index=f'{admin}/bucket?index&format={fmt}',
+            bucket_object=f'{admin}/bucket?object&format={fmt}',
+            bucket_policy=f'{admin}/bucket?policy&format={fmt}',
+            bucket_quota=f'{admin}/bucket?quota&format={fmt}',
+            usage=f'{admin}/usage?format={fmt}',
+        )
 
-        self._timeout = timeout
+        self._client_timeout = None if timeout is None else ClientTimeout(total=timeout)
         self._skip_auto_headers = ["Content-Type"]
-
-        self._auth = S3Auth(self._access_key, self._secret_key, self._server)
-
-        if pool_connections:
-            self._session = self._get_session()
+        # ssl and skip_auto_headers are passed with every request since a
+        # shared session may not have been set up like ours; its timeout is
+        # only overridden when one was given
+        self._request_options = {'ssl': self._ssl,
+                                 'skip_auto_headers': self._skip_auto_headers}
+        if self._client_timeout is not None:
+            self._request_options['timeout'] = self._client_timeout
+
+        self._signing_key = self._secret_key.encode('utf-8')
+
+        if session is not None and connector is not None:
+            raise ValueError('Only one of session and connector is allowed')
+
+        # the pooled session is created lazily on the first request so that
+        # it is bound to the running event loop, unless the caller shares a
+        # session or connector they own and close themselves
+        shared = session is not None or connector is not None
+        self._pool_connections = pool_connections or shared
+        self._connector = connector
+        self._session = session
+        self._owns_session = session is None
+        self._pool_size = pool_size
+        self._keepalive_timeout = keepalive_timeout
+        self._session_lock = asyncio.Lock()
+        self._session_loop = None
+
+        # GET responses that carried an ETag, keyed by request and revalidated
+        # with If-None-Match; a size of 0 disables the cache
+        self._etag_cache_size = etag_cache_size
+        self._etag_cache = OrderedDict()
 
     async def __aenter__(self) -> 'RGWAdmin':
         return self
@@ -89,21 +223,63 @@ class RGWAdmin:
         await self.close()
 
     async def close(self) -> None:
-        if self._session:
-            await self._session.close()
+        if self._session and self._owns_session:
+            session, self._session = self._session, None
+            await self._release(session, self._session_loop)
+
+    @staticmethod
+    async def _release(session: ClientSession,
+                       loop: asyncio.AbstractEventLoop | None) -> None:
+        '''Close a session unless it belongs to another loop that still runs'''
+        # a session can only be closed from the loop it was created on, or
+        # once that loop is gone and there is nothing left to shut down
+        if loop is None or loop.is_closed() or loop is asyncio.get_running_loop():
+            await session.close()
+
+    aclose = close
 
     def _get_session(self) -> ClientSession:
-        if self._ssl_context:
-            ssl = self._ssl_context
+        connector: BaseConnector
+        if self._connector is not None:
+            connector = self._connector
+        elif self._pool_connections:
+            connector = TCPConnector(
+                ssl=self._ssl,
+                limit=self._pool_size,
+                keepalive_timeout=self._keepalive_timeout,
+            )
         else:
-            ssl = self._verify
+            connector = TCPConnector(ssl=self._ssl)
 
         return ClientSession(
-            connector=TCPConnector(ssl=ssl),
+            connector=connector,
+            connector_owner=self._connector is None,
             skip_auto_headers=self._skip_auto_headers,
-            timeout=ClientTimeout(self._timeout),
+            timeout=self._client_timeout or ClientTimeout(),
         )
 
+    async def _ensure_session(self) -> ClientSession:
+        '''Return the pooled session, creating it on first use'''
+        if not self._owns_session:
+            return self._session  # type: ignore[return-value]
+
+        # the session and its lock are bound to the loop they were created
+        # on, so start over when the client is used from another loop, for
+        # example by a second asyncio.run()
+        loop = asyncio.get_running_loop()
+        if self._session_loop is not loop:
+            stale, stale_loop = self._session, self._session_loop
+            self._session, self._session_loop = None, loop
+            self._session_lock = asyncio.Lock()
+            if stale is not None:
+                await self._release(stale, stale_loop)
+
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    self._session = self._get_session()
+        return self._session
+
     @classmethod
     def connect(cls, **kwargs: Any) -> None:
         """Establish a new connection to RGWAdmin
@@ -136,30 +312,42 @@ class RGWAdmin:
 
     def get_base_url(self) -> str:
         '''Return a base URL.  I.e. https://ceph.server'''
-        return '%s://%s' % (self._protocol, self._server)
+        return self._base_url
 
     @staticmethod
     async def _load_request(r: ClientResponse) -> Any:
         '''Load the request given as JSON handling exceptions if necessary'''
+        j, _ = await RGWAdmin._read_json(r)
+        return RGWAdmin._check_response(r, j)
+
+    @staticmethod
+    def _decode(body: bytes) -> Any:
+        '''Decode a JSON response body, which is None when empty'''
+        return json_loads(body) if body.strip() else None
+
+    @staticmethod
+    async def _read_json(r: ClientResponse) -> tuple[Any, bool]:
+        '''Return the JSON of a response and whether it was in the body'''
+        body = await r.read()
         try:
-            j = await r.json(content_type=None)
+            return RGWAdmin._decode(body), True
         except ValueError:
             # some calls in the admin API encode the info in the headers
             # instead of the body.  The code that follows is an ugly hack
             # due to the fact that there's a bug in the admin API we're
             # interfacing with.
 
-            # set a default value for j in case we don't find json in the
-            # headers below
-            j = None
-
-            # find a key with a '{', since this will hold the json response
-            for k, v in r.headers.items():
-                if '{' in k:
-                    json_string = ":".join([k, v]).split('}')[0] + '}'
-                    j = json.load(StringIO(json_string))
-                    break
+            # find a key with a '{', since this will hold the json response;
+            # there is no JSON if there is none
+            header = next(((k, v) for k, v in r.headers.items() if '{' in k), None)
+            if header is None:
+                return None, False
+            k, v = header
+            return json_loads((k + ':' + v).partition('}')[0] + '}'), False
 
+    @staticmethod
+    def _check_response(r: ClientResponse, j: Any) -> Any:
+        '''Return the JSON of a successful response, raising for errors'''
         if r.status == HTTPStatus.OK:
             return j
         elif r.status == HTTPStatus.NO_CONTENT:
@@ -170,48 +358,127 @@ class RGWAdmin:
             else:
                 raise ServerDown(r.status)
 
-            for e in [AccessDenied, UserExists, InvalidAccessKey,
-                      InvalidKeyType, InvalidSecretKey, KeyExists, EmailExists,
-                      SubuserExists, InvalidAccess, InvalidArgument,
-                      IndexRepairFailed, BucketNotEmpty, ObjectRemovalFailed,
-                      BucketUnlinkFailed, BucketLinkFailed, NoSuchObject,
-                      InvalidCap, NoSuchCap, NoSuchUser, NoSuchBucket,
-                      NoSuchKey, IncompleteBody, BucketAlreadyExists,
-                      InternalError]:
-                if code == e.__name__:
-                    raise e(j)
+            e = _ERROR_MAP.get(code)
+            if e is not None:
+                raise e(j)
 
             raise RGWAdminException(code, raw=j)
 
-    async def request(self, method: str, request: str, headers: dict | None = None, data: Any = None) -> Any:
-        url = '%s%s' % (self.get_base_url(), request)
+    @asynccontextmanager
+    async def _send(
+        self,
+        method: str,
+        request: str,
+        headers: dict | None = None,
+        data: Any = None,
+    ) -> AsyncIterator[ClientResponse]:
+        '''Sign and send a request, yielding the unread response'''
+        url = self._base_url + request
         log.debug('URL: %s' % url)
         log.debug('Access Key: %s' % self._access_key)
         log.debug('Verify: %s, SSL Context: %s' % (self._verify, self._ssl_context))
 
-        # prepare headers for auth
-        prepped = Request(method, url, headers=headers, auth=self._auth).prepare()
-        prepped_headers = prepped.headers
-
-        if data is not None:
-            prepped_headers["Content-Length"] = str(len(data))
-
-        request_params = {
-            "method": method,
-            "url": url,
-            "headers": prepped_headers,
-            "data": data,
-        }
-
-        if self._session:
+        if self._pool_connections:
             # use connection pool
-            async with self._session.request(**request_params) as response:
-                return await self._load_request(response)
+            session = await self._ensure_session()
         else:
             # do not use connection pool
-            async with self._get_session() as session:
-                async with session.request(**request_params) as response:
-                    return await self._load_request(response)
+            session = self._get_session()
+
+        try:
+            async with session.request(
+                method,
+                url,
+                headers=self._sign(method, request, headers),
+                data=data,
+                **self._request_options,
+            ) as response:
+                yield response
+        finally:
+            if not self._pool_connections:
+                await session.close()
+
+    def _sign(
+        self,
+        method: str,
+        request: str,
+        headers: dict | None = None,
+    ) -> CIMultiDict:
+        '''Return the headers for a request signed with AWS signature version 2'''
+        signed: CIMultiDict = CIMultiDict(headers or {})
+        if 'Date' not in signed and 'X-Amz-Date' not in signed:
+            signed['Date'] = formatdate(usegmt=True)
+
+        interesting = {'content-md5': '', 'content-type': '', 'date': ''}
+        for key, value in signed.items():
+            key = key.lower()
+            if value and (key in interesting or key.startswith('x-amz-')):
+                interesting[key] = value.strip()
+        # if x-amz-date is used it supersedes the date header
+        if 'x-amz-date' in interesting:
+            interesting['date'] = ''
+
+        string_to_sign = method.upper() + '\n'
+        for key in sorted(interesting):
+            if key.startswith('x-amz-'):
+                string_to_sign += '%s:%s\n' % (key, interesting[key])
+            else:
+                string_to_sign += '%s\n' % interesting[key]
+
+        # the canonical resource is the path plus any S3 subresources
+        path, _, query = request.partition('?')
+        string_to_sign += path
+        subresources = []
+        for arg in sorted(query.split('&')):
+            k, sep, v = arg.partition('=')
+            if k in S3_SUBRESOURCES:
+                subresources.append(k + sep + unquote(v))
+        if subresources:
+            string_to_sign += '?' + '&'.join(subresources)
+
+        digest = hmac.new(self._signing_key, string_to_sign.encode('utf-8'),
+                          hashlib.sha1).digest()
+        signature = base64.b64encode(digest).decode()
+        signed['Authorization'] = 'AWS %s:%s' % (self._access_key, signature)
+        return signed
+
+    async def request(
+        self,
+        method: str,
+        request: str,
+        headers: dict | None = None,
+        data: Any = None,
+    ) -> Any:
+        cacheable = self._etag_cache_size > 0 and method.lower() == 'get'
+        cached = self._etag_cache.get(request) if cacheable else None
+        if cached is not None:
+            headers = {**(headers or {}), 'If-None-Match': cached[0]}
+
+        async with self._send(method, request, headers=headers, data=data) as response:
+            if cached is not None and response.status == HTTPStatus.NOT_MODIFIED:
+                self._etag_cache.move_to_end(request)
+                # decode a fresh copy since callers may mutate what they get
+                return self._decode(cached[1])
+
+            j, from_body = await self._read_json(response)
+            j = self._check_response(response, j)
+
+            # only JSON that came from the body can be replayed from it
+            etag = response.headers.get('ETag') if cacheable else None
+            if etag and from_body and response.status == HTTPStatus.OK:
+                # the body has already been read, so this does not block
+                self._etag_cache[request] = (etag, await response.read())
+                self._etag_cache.move_to_end(request)
+                if len(self._etag_cache) > self._etag_cache_size:
+                    self._etag_cache.popitem(last=False)
+            return j
+
+    def _metadata_request(self, metadata_type: str, params: dict | None = None) -> str:
+        if metadata_type not in self.metadata_types:
+            raise InvalidArgument('Bad metadata_type %r' % metadata_type)
+
+        query = _qs(params or {})
+        return f'{self._admin_prefix}/metadata/{metadata_type}?{query}'
 
     async def _request_metadata(
         self,
@@ -221,16 +488,9 @@ class RGWAdmin:
         headers: dict | None = None,
         data: Any = None,
     ) -> Any:
-        if metadata_type not in self.metadata_types:
-            raise Exception("Bad metadata_type")
-
-        if params is None:
-            params = {}
-        params = '&'.join(['%s=%s' % (k, v) for k, v in params.items()])
-        request = '/%s/metadata/%s?%s' % (self._admin, metadata_type, params)
         return await self.request(
             method=method,
-            request=request,
+            request=self._metadata_request(metadata_type, params),
             headers=headers,
             data=data,
         )
@@ -244,11 +504,11 @@ class RGWAdmin:
         headers: dict | None = None,
     ) -> Any:
         ''' Returns a JSON object representation of the metadata '''
-        params = {'format': self._response}
+        params: dict[str, Any] = {'format': self._response}
         if key is not None:
             params['key'] = key
         if marker is not None:
-            params['marker'] = quote(marker)
+            params['marker'] = marker
         if max_entries is not None:
             params['max-entries'] = max_entries
         return await self._request_metadata(
@@ -258,13 +518,71 @@ class RGWAdmin:
             headers=headers,
         )
 
+    async def iter_metadata(
+        self,
+        metadata_type: str,
+        max_entries: int | None = None,
+        marker: str | None = None,
+        headers: dict | None = None,
+    ) -> AsyncGenerator[Any, None]:
+        '''
+        Yield the keys of a metadata listing one at a time
+
+        When ijson is installed the listing is decoded while it streams in,
+        so memory use does not grow with the number of keys and callers that
+        stop early do not wait for the whole listing.  Otherwise this falls
+        back to get_metadata().
+
+        Passing `max_entries` or `marker` makes the gateway answer in pages;
+        `max_entries` is then the page size and every page is followed until
+        the listing is no longer truncated.
+        '''
+        paged = max_entries is not None or marker is not None
+        while True:
+            # a paged listing is an object with the keys, whether it was
+            # truncated and the marker to continue from; otherwise it is a
+            # bare array of keys
+            truncated = False
+            if ijson is None:
+                j = await self.get_metadata(metadata_type, max_entries=max_entries,
+                                            marker=marker, headers=headers)
+                if paged:
+                    truncated, marker = j.get('truncated', False), j.get('marker')
+                    j = j['keys']
+                for item in j:
+                    yield item
+            else:
+                params = {'format': self._response, 'marker': marker,
+                          'max-entries': max_entries}
+                request = self._metadata_request(metadata_type, params)
+                async with self._send('get', request, headers=headers) as response:
+                    if response.status != HTTPStatus.OK:
+                        # raises for error responses
+                        await self._load_request(response)
+                        return
+                    if not paged:
+                        async for item in ijson.items_async(response.content, 'item'):
+                            yield item
+                        return
+                    # metadata keys are strings, so they need no building
+                    events = ijson.parse_async(response.content)
+                    async for prefix, event, value in events:
+                        if prefix == 'keys.item':
+                            yield value
+                        elif prefix == 'truncated':
+                            truncated = value
+                        elif prefix == 'marker':
+                            marker = value
+            if not (paged and truncated and marker):
+                return
+
     async def put_metadata(self, metadata_type: str, key: str, json_string: str) -> Any:
         return await self._request_metadata(
             method='put',
             metadata_type=metadata_type,
             params={'key': key},
             headers={'Content-Type': 'application/json'},
-            data=json_string,
+            data=json_string.encode('utf-8'),
         )
 
     # Alias for compatability:
@@ -311,17 +629,21 @@ class RGWAdmin:
     ) -> Any:
         if uid is not None and access_key is not None:
             raise ValueError('Only one of uid and access_key is allowed')
-        parameters = ''
-        if uid is not None:
-            parameters += '&uid=%s' % uid
-        if access_key is not None:
-            parameters += '&access-key=%s' % access_key
-        parameters += '&stats=%s&sync=%s' % (stats, sync)
-        return await self.request('get', '/%s/user?format=%s%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'uid': uid,
+            'access-key': access_key,
+            'stats': stats,
+            'sync': sync,
+        })
+        return await self.request('get', f'{self._urls.user}&{parameters}')
 
     async def get_users(self) -> Any:
         return await self.get_metadata(metadata_type='user')
 
+    def iter_users(self) -> AsyncGenerator[Any, None]:
+        '''Yield the uid of every user in the radosgw'''
+        return self.iter_metadata(metadata_type='user')
+
     async def create_user(
         self,
         uid: str,
@@ -335,22 +657,19 @@ class RGWAdmin:
         max_buckets: int | None = None,
         suspended: bool = False,
     ) -> Any:
-        parameters = 'uid=%s&display-name=%s' % (uid, display_name)
-        if email is not None:
-            parameters += '&email=%s' % email
-        if key_type is not None:
-            parameters += '&key-type=%s' % key_type
-        if access_key is not None:
-            parameters += '&access-key=%s' % access_key
-        if secret_key is not None:
-            parameters += '&secret-key=%s' % secret_key
-        if user_caps is not None:
-            parameters += '&user-caps=%s' % user_caps
-        parameters += '&generate-key=%s' % generate_key
-        if max_buckets is not None:
-            parameters += '&max-buckets=%s' % max_buckets
-        parameters += '&suspended=%s' % suspended
-        return await self.request('put', '/%s/user?format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'uid': uid,
+            'display-name': display_name,
+            'email': email,
+            'key-type': key_type,
+            'access-key': access_key,
+            'secret-key': secret_key,
+            'user-caps': user_caps,
+            'generate-key': generate_key,
+            'max-buckets': max_buckets,
+            'suspended': suspended,
+        })
+        return await self.request('put', f'{self._urls.user}&{parameters}')
 
     async def get_usage(
         self,
@@ -360,16 +679,14 @@ class RGWAdmin:
         show_entries: bool = False,
         show_summary: bool = False,
     ) -> Any:
-        parameters = ''
-        if uid is not None:
-            parameters += '&uid=%s' % uid
-        if start is not None:
-            parameters += '&start=%s' % start
-        if end is not None:
-            parameters += '&end=%s' % end
-        parameters += '&show-entries=%s' % show_entries
-        parameters += '&show-summary=%s' % show_summary
-        return await self.request('get', '/%s/usage?format=%s%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'uid': uid,
+            'start': start,
+            'end': end,
+            'show-entries': show_entries,
+            'show-summary': show_summary,
+        })
+        return await self.request('get', f'{self._urls.usage}&{parameters}')
 
     async def trim_usage(
         self,
@@ -378,15 +695,13 @@ class RGWAdmin:
         end: str | datetime | None = None,
         remove_all: bool = False,
     ) -> Any:
-        parameters = ''
-        if uid is not None:
-            parameters += '&uid=%s' % uid
-        if start is not None:
-            parameters += '&start=%s' % start
-        if end is not None:
-            parameters += '&end=%s' % end
-        parameters += '&remove-all=%s' % remove_all
-        return await self.request('delete', '/%s/usage?format=%s%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'uid': uid,
+            'start': start,
+            'end': end,
+            'remove-all': remove_all,
+        })
+        return await self.request('delete', f'{self._urls.usage}&{parameters}')
 
     async def modify_user(
         self,
@@ -401,31 +716,25 @@ class RGWAdmin:
         max_buckets: int | None = None,
         suspended: bool | None = None,
     ) -> Any:
-        parameters = 'uid=%s' % uid
-        if display_name is not None:
-            parameters += '&display-name=%s' % display_name
-        if email is not None:
-            parameters += '&email=%s' % email
-        if key_type is not None:
-            parameters += '&key-type=%s' % key_type
-        if access_key is not None:
-            parameters += '&access-key=%s' % access_key
-        if secret_key is not None:
-            parameters += '&secret-key=%s' % secret_key
-        if user_caps is not None:
-            parameters += '&user-caps=%s' % user_caps
-        parameters += '&generate-key=%s' % generate_key
-        if max_buckets is not None:
-            parameters += '&max-buckets=%s' % max_buckets
-        if suspended is not None:
-            parameters += '&suspended=%s' % suspended
-        return await self.request('post', '/%s/user?format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'uid': uid,
+            'display-name': display_name,
+            'email': email,
+            'key-type': key_type,
+            'access-key': access_key,
+            'secret-key': secret_key,
+            'user-caps': user_caps,
+            'generate-key': generate_key,
+            'max-buckets': max_buckets,
+            'suspended': suspended,
+        })
+        return await self.request('post', f'{self._urls.user}&{parameters}')
 
     async def get_quota(self, uid: str, quota_type: str) -> Any:
         if quota_type not in ['user', 'bucket']:
             raise InvalidQuotaType
-        parameters = 'uid=%s&quota-type=%s' % (uid, quota_type)
-        return await self.request('get', '/%s/user?quota&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'uid': uid, 'quota-type': quota_type})
+        return await self.request('get', f'{self._urls.user_quota}&{parameters}')
 
     async def get_user_quota(self, uid: str) -> Any:
         return await self.get_quota(uid=uid, quota_type='user')
@@ -440,17 +749,17 @@ class RGWAdmin:
         max_size_kb: int | None = None,
         max_objects: int | None = None,
         enabled: bool | None = None,
-    ) -> str:
-        quota = ''
+    ) -> dict[str, Any]:
+        quota: dict[str, Any] = {}
         if max_size is not None:
-            quota += '&max-size=%d' % max_size
+            quota['max-size'] = int(max_size)
         elif max_size_kb is not None:
-            quota += '&max-size-kb=%d' % max_size_kb
+            quota['max-size-kb'] = int(max_size_kb)
 
         if max_objects is not None:
-            quota += '&max-objects=%d' % max_objects
+            quota['max-objects'] = int(max_objects)
         if enabled is not None:
-            quota += '&enabled=%s' % str(enabled).lower()
+            quota['enabled'] = enabled
         return quota
 
     async def set_user_quota(
@@ -475,8 +784,8 @@ class RGWAdmin:
         if quota_type not in ['user', 'bucket']:
             raise InvalidQuotaType
         quota = self._quota(max_size=max_size, max_size_kb=max_size_kb, max_objects=max_objects, enabled=enabled)
-        parameters = 'uid=%s&quota-type=%s%s' % (uid, quota_type, quota)
-        return await self.request('put', '/%s/user?quota&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'uid': uid, 'quota-type': quota_type, **quota})
+        return await self.request('put', f'{self._urls.user_quota}&{parameters}')
 
     async def set_bucket_quota(
         self,
@@ -489,13 +798,12 @@ class RGWAdmin:
     ) -> Any:
         '''Set the quota on an individual bucket'''
         quota = self._quota(max_size=max_size, max_size_kb=max_size_kb, max_objects=max_objects, enabled=enabled)
-        parameters = 'uid=%s&bucket=%s%s' % (uid, bucket, quota)
-        return await self.request('put', '/%s/bucket?quota&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'uid': uid, 'bucket': bucket, **quota})
+        return await self.request('put', f'{self._urls.bucket_quota}&{parameters}')
 
     async def remove_user(self, uid: str, purge_data: bool = False) -> Any:
-        parameters = 'uid=%s' % uid
-        parameters += '&purge-data=%s' % purge_data
-        return await self.request('delete', '/%s/user?format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'uid': uid, 'purge-data': purge_data})
+        return await self.request('delete', f'{self._urls.user}&{parameters}')
 
     async def create_subuser(
         self,
@@ -507,18 +815,20 @@ class RGWAdmin:
         access: str | None = None,
         generate_secret: bool = False,
     ) -> Any:
-        parameters = 'uid=%s' % uid
-        if subuser is not None:
-            parameters += '&subuser=%s' % subuser
-        if secret_key is not None and access_key is not None:
-            parameters += '&access-key=%s' % access_key
-            parameters += '&secret-key=%s' % secret_key
-        if key_type is not None and key_type.lower() in ['s3', 'swift']:
-            parameters += '&key-type=%s' % key_type
-        if access is not None:
-            parameters += '&access=%s' % access
-        parameters += '&generate-secret=%s' % generate_secret
-        return await self.request('put', '/%s/user?subuser&format=%s&%s' % (self._admin, self._response, parameters))
+        if secret_key is None or access_key is None:
+            secret_key = access_key = None
+        if key_type is not None and key_type.lower() not in ['s3', 'swift']:
+            key_type = None
+        parameters = _qs({
+            'uid': uid,
+            'subuser': subuser,
+            'access-key': access_key,
+            'secret-key': secret_key,
+            'key-type': key_type,
+            'access': access,
+            'generate-secret': generate_secret,
+        })
+        return await self.request('put', f'{self._urls.user_subuser}&{parameters}')
 
     async def modify_subuser(
         self,
@@ -529,18 +839,19 @@ class RGWAdmin:
         access: str | None = None,
         generate_secret: bool = False,
     ) -> Any:
-        parameters = 'uid=%s&subuser=%s' % (uid, subuser)
-        if secret is not None:
-            parameters += '&secret=%s' % secret
-        parameters += '&key-type=%s' % key_type
-        if access is not None:
-            parameters += '&access=%s' % access
-        parameters += '&generate-secret=%s' % generate_secret
-        return await self.request('post', '/%s/user?subuser&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'uid': uid,
+            'subuser': subuser,
+            'secret': secret,
+            'key-type': key_type,
+            'access': access,
+            'generate-secret': generate_secret,
+        })
+        return await self.request('post', f'{self._urls.user_subuser}&{parameters}')
 
     async def remove_subuser(self, uid: str, subuser: str, purge_keys: bool = True) -> Any:
-        parameters = 'uid=%s&subuser=%s&purge-keys=%s' % (uid, subuser, purge_keys)
-        return await self.request('delete', '/%s/user?subuser&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'uid': uid, 'subuser': subuser, 'purge-keys': purge_keys})
+        return await self.request('delete', f'{self._urls.user_subuser}&{parameters}')
 
     async def create_key(
         self,
@@ -551,16 +862,15 @@ class RGWAdmin:
         secret_key: str | None = None,
         generate_key: bool = True,
     ) -> Any:
-        parameters = 'uid=%s' % uid
-        if subuser is not None:
-            parameters += '&subuser=%s' % subuser
-        parameters += '&key-type=%s' % key_type
-        if access_key is not None:
-            parameters += '&access-key=%s' % access_key
-        if secret_key is not None:
-            parameters += '&secret-key=%s' % secret_key
-        parameters += '&generate-key=%s' % generate_key
-        return await self.request('put', '/%s/user?key&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'uid': uid,
+            'subuser': subuser,
+            'key-type': key_type,
+            'access-key': access_key,
+            'secret-key': secret_key,
+            'generate-key': generate_key,
+        })
+        return await self.request('put', f'{self._urls.user_key}&{parameters}')
 
     async def remove_key(
         self,
@@ -569,75 +879,104 @@ class RGWAdmin:
         uid: str | None = None,
         subuser: str | None = None,
     ) -> Any:
-        parameters = 'access-key=%s' % access_key
-        if key_type is not None:
-            parameters += '&key-type=%s' % key_type
-        if uid is not None:
-            parameters += '&uid=%s' % uid
-        if subuser is not None:
-            parameters += '&subuser=%s' % subuser
-        return await self.request('delete', '/%s/user?key&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({
+            'access-key': access_key,
+            'key-type': key_type,
+            'uid': uid,
+            'subuser': subuser,
+        })
+        return await self.request('delete', f'{self._urls.user_key}&{parameters}')
 
     async def get_buckets(self) -> Any:
         '''Returns a list of all buckets in the radosgw'''
         return await self.get_metadata(metadata_type='bucket')
 
+    def iter_buckets(self) -> AsyncGenerator[Any, None]:
+        '''Yield the name of every bucket in the radosgw'''
+        return self.iter_metadata(metadata_type='bucket')
+
+    async def has_bucket(self, bucket: str) -> bool:
+        '''Return True if the bucket exists, stopping at the first match'''
+        async with aclosing(self.iter_buckets()) as buckets:
+            async for name in buckets:
+                if name == bucket:
+                    return True
+        return False
+
     async def get_bucket(self, bucket: str | None = None, uid: str | None = None, stats: bool = False) -> Any:
-        parameters = ''
-        if bucket is not None:
-            parameters += '&bucket=%s' % bucket
-        if uid is not None:
-            parameters += '&uid=%s' % uid
-        parameters += '&stats=%s' % stats
-        return await self.request('get', '/%s/bucket?format=%s%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'bucket': bucket, 'uid': uid, 'stats': stats})
+        return await self.request('get', f'{self._urls.bucket}&{parameters}')
 
     async def check_bucket_index(self, bucket: str, check_objects: bool = False, fix: bool = False) -> Any:
-        parameters = 'bucket=%s' % bucket
-        parameters += '&check-objects=%s' % check_objects
-        parameters += '&fix=%s' % fix
-        return await self.request('get', '/%s/bucket?index&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'bucket': bucket, 'check-objects': check_objects, 'fix': fix})
+        return await self.request('get', f'{self._urls.bucket_index}&{parameters}')
 
     async def remove_bucket(self, bucket: str, purge_objects: bool = False) -> Any:
-        parameters = 'bucket=%s' % bucket
-        parameters += '&purge-objects=%s' % purge_objects
-        return await self.request('delete', '/%s/bucket?format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'bucket': bucket, 'purge-objects': purge_objects})
+        return await self.request('delete', f'{self._urls.bucket}&{parameters}')
 
     async def unlink_bucket(self, bucket: str, uid: str) -> Any:
-        parameters = 'bucket=%s&uid=%s' % (bucket, uid)
-        return await self.request('post', '/%s/bucket?format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'bucket': bucket, 'uid': uid})
+        return await self.request('post', f'{self._urls.bucket}&{parameters}')
 
     async def link_bucket(self, bucket: str, bucket_id: str, uid: str) -> Any:
         # note that even though the Ceph docs say that bucket-id is optional
         # the API call will fail (InvalidArgument) if it is omitted.
-        parameters = 'bucket=%s&bucket-id=%s&uid=%s' % (bucket, bucket_id, uid)
-        return await self.request('put', '/%s/bucket?format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'bucket': bucket, 'bucket-id': bucket_id, 'uid': uid})
+        return await self.request('put', f'{self._urls.bucket}&{parameters}')
 
     async def remove_object(self, bucket: str, object_name: str) -> Any:
-        parameters = 'bucket=%s&object=%s' % (bucket, object_name)
-        return await self.request('delete', '/%s/bucket?object&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'bucket': bucket, 'object': object_name})
+        return await self.request('delete', f'{self._urls.bucket_object}&{parameters}')
 
     async def get_policy(self, bucket: str, object_name: str | None = None) -> Any:
-        parameters = 'bucket=%s' % bucket
-        if object_name is not None:
-            parameters += '&object=%s' % object_name
-        return await self.request('get', '/%s/bucket?policy&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'bucket': bucket, 'object': object_name})
+        return await self.request('get', f'{self._urls.bucket_policy}&{parameters}')
 
     async def add_capability(self, uid: str, user_caps: str) -> Any:
-        parameters = 'uid=%s&user-caps=%s' % (uid, user_caps)
-        return await self.request('put', '/%s/user?caps&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'uid': uid, 'user-caps': user_caps})
+        return await self.request('put', f'{self._urls.user_caps}&{parameters}')
 
     async def remove_capability(self, uid: str, user_caps: str) -> Any:
-        parameters = 'uid=%s&user-caps=%s' % (uid, user_caps)
-        return await self.request('delete', '/%s/user?caps&format=%s&%s' % (self._admin, self._response, parameters))
+        parameters = _qs({'uid': uid, 'user-caps': user_caps})
+        return await self.request('delete', f'{self._urls.user_caps}&{parameters}')
 
     async def get_bucket_instances(self) -> Any:
         '''Returns a list of all bucket instances in the radosgw'''
         return await self.get_metadata(metadata_type='bucket.instance')
 
+    async def get_bucket_and_instances(self, bucket: str) -> tuple[Any, Any]:
+        '''Return a bucket and all bucket instances, fetching both concurrently'''
+        bucket_info, instances = await asyncio.gather(
+            self.get_bucket(bucket=bucket),
+            self.get_bucket_instances(),
+        )
+        return bucket_info, instances
+
+    def iter_bucket_instances(self) -> AsyncGenerator[Any, None]:
+        '''Yield every bucket instance in the radosgw'''
+        return self.iter_metadata(metadata_type='bucket.instance')
+
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def parse_rados_datestring(s: str) -> time.struct_time:
-        return time.strptime(s, "%Y-%m-%dT%H:%M:%S.%fZ")
+        m = RADOS_DATESTRING.fullmatch(s)
+        if m is None:
+            # let strptime handle (or reject) anything unusual
+            return time.strptime(s, "%Y-%m-%dT%H:%M:%S.%fZ")
+        year, month, day, hour, minute, second = map(int, m.groups())
+        try:
+            return datetime(year, month, day, hour, minute, second).timetuple()
+        except ValueError:
+            # strptime also takes leap seconds, which datetime rejects
+            return time.strptime(s, "%Y-%m-%dT%H:%M:%S.%fZ")
 
     @staticmethod
-    def gen_secret_key(size: int = 40, chars: Sequence = LETTERS + string.digits) -> str:
-        return ''.join(random.choice(chars) for _ in range(size))
+    def gen_secret_key(size: int = 40, chars: Sequence | None = None) -> str:
+        '''Return a random key drawn from the OS random source.
+
+        Unless `chars` is given the key uses the URL-safe base64 alphabet.
+        '''
+        if chars is None:
+            return secrets.token_urlsafe(size)[:size]
+        return ''.join(secrets.choice(chars) for _ in range(size))
@@ -14,8 +14,6 @@ Prefix: %{_prefix}
 BuildArch: noarch
 Vendor: UMIACS Staff <github@umiacs.umd.edu>
 Requires: python3
-Requires: python3-requests
-Requires: python3-requests-aws
 Url: https://github.com/UMIACS/rgwadmin
 
 %description
@@ -17,8 +17,7 @@ with open(path.join(BASE_DIR, 'README.md'), encoding='utf-8') as f:
 
 install_requires = [
     "aiohttp",
-    "requests",
-    "requests-aws",
+    "multidict",
 ]
 
 _version_re = re.compile(r'__version__\s+=\s+(.*)')
@@ -33,6 +32,7 @@ setup(
     zip_safe=False,
     version=version,
     install_requires=install_requires,
+    extras_require={"orjson": ["orjson"], "ijson": ["ijson"]},
     author="Derek Yarnell <derek@umiacs.umd.edu>, Mikle Green",
     url="https://github.com/mikle-green/aiorgwadmin",
     license="LGPL v2.1",
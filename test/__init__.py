@@ -1,7 +1,19 @@
+import asyncio
+import functools
+import itertools
+import os
+import time
+import unittest
+from collections.abc import AsyncIterator, Iterable, Mapping
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import Any
+
 import aioboto3
+import aiohttp
 from pydantic import BaseSettings
 
-from aiorgwadmin import RGWAdmin
+from aiorgwadmin import RGWAdmin, RGWUser
 
 
 class CephSettings(BaseSettings):
@@ -20,18 +32,44 @@ class CephSettings(BaseSettings):
         env_prefix = "ceph_"
 
 
-async def create_bucket(name: str, owner: str):
+# names only have to be unique on the gateway: count up from the start time
+# and add the pid so that concurrent test processes never collide
+_counter = itertools.count(int(time.time()))
+
+
+def unique_id(prefix: str) -> str:
+    """Return a new name like ``prefix-<pid>-<n>`` for a test user or bucket."""
+    return f"{prefix}-{os.getpid()}-{next(_counter)}"
+
+
+@functools.lru_cache(maxsize=1)
+def _settings() -> CephSettings:
+    return CephSettings()
+
+
+# the boto session only holds configuration, so it can be shared by every
+# test; the s3 resource opens connections bound to the running event loop
+# and is created per call since each test runs in its own loop
+_boto_session = aioboto3.Session()
+
+
+async def create_bucket(name: str, owner: str, rgw: RGWAdmin | None = None):
     """
     This is a helper function for tests to create buckets so they can assert changes
     on the gateway based on the bucket's existence.
+
+    Pass the test's own `rgw` to look up the owner over its pooled connection.
     """
-    rgw = RGWAdmin(**get_environment_creds())
-    user = await rgw.get_user(owner)
+    if rgw is None:
+        async with RGWAdmin(**get_environment_creds()) as rgw:
+            user = await rgw.get_user(owner)
+    else:
+        user = await rgw.get_user(owner)
     key = user["keys"][0]
 
-    ceph = CephSettings()
+    ceph = _settings()
 
-    async with aioboto3.Session().resource(
+    async with _boto_session.resource(
             "s3",
             endpoint_url=ceph.s3_url,
             aws_access_key_id=key["access_key"],
@@ -42,10 +80,84 @@ async def create_bucket(name: str, owner: str):
         await bucket.create()
 
 
-def get_environment_creds():
-    ceph = CephSettings()
-    return {'access_key': ceph.access_key,
-            'secret_key': ceph.secret_key,
-            'server': ceph.server,
-            'secure': ceph.secure,
-            'verify': ceph.verify}
+async def create_buckets(names: Iterable[str], owner: str, rgw: RGWAdmin | None = None):
+    """Create several buckets for `owner` concurrently."""
+    await asyncio.gather(*(create_bucket(name, owner, rgw=rgw) for name in names))
+
+
+@asynccontextmanager
+async def temp_users(count: int, display_name: str,
+                     **kwargs: Any) -> AsyncIterator[dict[str, RGWUser]]:
+    """
+    Create `count` users concurrently for the duration of the block and delete
+    them concurrently afterwards, even when the block fails, so that failed
+    runs do not leave users behind.  The users are given by the id they were
+    created with.
+    """
+    user_ids = [unique_id("user") for _ in range(count)]
+    results = await asyncio.gather(
+        *(RGWUser.create(user_id=user_id, display_name=display_name, **kwargs)
+          for user_id in user_ids),
+        return_exceptions=True)
+    users = {user_id: u for user_id, u in zip(user_ids, results)
+             if isinstance(u, RGWUser)}
+    try:
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, BaseException):
+                raise result
+            if result is None:
+                raise RuntimeError(f"user {user_id} was not found after creating it")
+        yield users
+    finally:
+        # delete() only logs for users the block already removed
+        await asyncio.gather(*(u.delete() for u in users.values()))
+
+
+@functools.lru_cache(maxsize=1)
+def get_environment_creds() -> Mapping[str, Any]:
+    # built once per process; read-only since every caller shares the result
+    ceph = _settings()
+    return MappingProxyType({'access_key': ceph.access_key,
+                             'secret_key': ceph.secret_key,
+                             'server': ceph.server,
+                             'secure': ceph.secure,
+                             'verify': ceph.verify})
+
+
+# answer of the first reachability probe, shared by every later caller
+_reachable: bool | None = None
+
+
+async def rgw_reachable(timeout: float = 5) -> bool:
+    """
+    Probe the gateway once per process with a short timeout, so that an
+    unreachable gateway skips the tests instead of failing each of them after
+    its own connection timeout.  Only failing to connect counts as
+    unreachable: missing credentials or a gateway that connects but answers
+    slowly still fail.
+    """
+    global _reachable
+    if _reachable is None:
+        creds = get_environment_creds()
+        try:
+            async with RGWAdmin(**creds, timeout=timeout) as rgw:
+                # a single key, so the answer does not grow with the cluster
+                await rgw.get_metadata('user', max_entries=1)
+        except (aiohttp.ClientOSError, aiohttp.ServerDisconnectedError,
+                aiohttp.ConnectionTimeoutError):
+            _reachable = False
+        else:
+            _reachable = True
+    return _reachable
+
+
+def require_rgw() -> None:
+    """Raise unittest.SkipTest unless the gateway is reachable; for setUpClass."""
+    # a private loop leaves the current event loop of the test runner alone
+    loop = asyncio.new_event_loop()
+    try:
+        reachable = loop.run_until_complete(rgw_reachable())
+    finally:
+        loop.close()
+    if not reachable:
+        raise unittest.SkipTest("RGW gateway is unreachable")
@@ -0,0 +1,25 @@
+import aiohttp
+import pytest
+import pytest_asyncio
+
+import aiorgwadmin
+from . import get_environment_creds, rgw_reachable
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def rgw_admin():
+    """
+    A pooled RGWAdmin shared by all tests of a session, installed once as the
+    process-wide connection that RGWUser uses.
+    """
+    if not await rgw_reachable():
+        pytest.skip("RGW gateway is unreachable")
+    # cache DNS for the whole session and keep idle sockets open between tests
+    connector = aiohttp.TCPConnector(limit=16, limit_per_host=8, ttl_dns_cache=300,
+                                     keepalive_timeout=60)
+    rgw = aiorgwadmin.RGWAdmin(**get_environment_creds(), connector=connector)
+    aiorgwadmin.RGWAdmin.set_connection(rgw)
+    yield rgw
+    await rgw.close()
+    # RGWAdmin leaves a connector that was passed in open
+    await connector.close()
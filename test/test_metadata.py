@@ -3,37 +3,65 @@
 import json
 import logging
 import unittest
-import uuid
 from urllib.parse import quote
 
 import aiorgwadmin
-from . import create_bucket, get_environment_creds
+from . import create_buckets, get_environment_creds, require_rgw, unique_id
 
 logging.basicConfig(level=logging.WARNING)
 
 
 class MetadataTest(unittest.IsolatedAsyncioTestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        require_rgw()
+
     async def asyncSetUp(self):
         self.rgw = aiorgwadmin.RGWAdmin(**get_environment_creds())
-        aiorgwadmin.RGWAdmin.set_connection(self.rgw)
 
-        self.user = f"user-{uuid.uuid4()}"
+        self.user = unique_id("user")
         await self.rgw.create_user(uid=self.user, display_name=f"Unit Test {self.user}")
 
     async def asyncTearDown(self):
-        await self.rgw.remove_user(uid=self.user, purge_data=True)
+        try:
+            # purging the user also removes every bucket it owns
+            await self.rgw.remove_user(uid=self.user, purge_data=True)
+        finally:
+            await self.rgw.close()
 
-    async def test_get_metadata(self):
-        bucket_name = f"bucket-{uuid.uuid4()}"
-        self.assertTrue(bucket_name not in await self.rgw.get_metadata('bucket'))
+    async def create_buckets(self, *names):
+        await create_buckets(names, owner=self.user, rgw=self.rgw)
 
-        await create_bucket(bucket_name, owner=self.user)
-        self.assertTrue(bucket_name in await self.rgw.get_metadata('bucket'))
+    async def test_get_metadata(self):
+        bucket_names = [unique_id("bucket") for _ in range(2)]
+        buckets = await self.rgw.get_metadata('bucket')
+        for bucket_name in bucket_names:
+            self.assertTrue(bucket_name not in buckets)
+
+        await self.create_buckets(*bucket_names)
+        buckets = await self.rgw.get_metadata('bucket')
+        for bucket_name in bucket_names:
+            self.assertTrue(bucket_name in buckets)
+
+    async def test_iter_metadata(self):
+        bucket_name = unique_id("bucket")
+        self.assertFalse(await self.rgw.has_bucket(bucket_name))
+
+        await self.create_buckets(bucket_name)
+        self.assertTrue(await self.rgw.has_bucket(bucket_name))
+        buckets = [b async for b in self.rgw.iter_metadata('bucket')]
+        self.assertEqual(sorted(buckets), sorted(await self.rgw.get_buckets()))
+
+    async def test_iter_metadata_pages(self):
+        await self.create_buckets(*(unique_id("bucket") for _ in range(2)))
+        # one key per page, so the listing has to follow the marker
+        buckets = [b async for b in self.rgw.iter_metadata('bucket', max_entries=1)]
+        self.assertEqual(sorted(buckets), sorted(await self.rgw.get_buckets()))
 
     async def test_put_metadata(self):
-        bucket_name = f"bucket-{uuid.uuid4()}"
-        await create_bucket(bucket_name, owner=self.user)
+        bucket_name = unique_id("bucket")
+        await self.create_buckets(bucket_name)
 
         ret_json = await self.rgw.get_metadata('bucket', key=bucket_name)
         self.assertEqual(ret_json['data']['bucket']['name'], bucket_name)
@@ -42,8 +70,8 @@ class MetadataTest(unittest.IsolatedAsyncioTestCase):
         await self.rgw.put_metadata('bucket', key=bucket_name, json_string=json_str)
 
     async def test_metadata_lock_unlock(self):
-        bucket_name = f"bucket-{uuid.uuid4()}"
-        await create_bucket(bucket_name, owner=self.user)
+        bucket_name = unique_id("bucket")
+        await self.create_buckets(bucket_name)
 
         await self.rgw.lock_metadata('bucket', key=bucket_name, lock_id='abc',
                                      length=5)
@@ -51,19 +79,18 @@ class MetadataTest(unittest.IsolatedAsyncioTestCase):
 
     async def test_invalid_metadata_unlock(self):
         with self.assertRaises(aiorgwadmin.exceptions.NoSuchKey):
-            key = f"bucket-{uuid.uuid4()}"
+            key = unique_id("bucket")
             await self.rgw.unlock_metadata('bucket', key=key, lock_id='abc')
 
     async def test_metadata_type_valid(self):
-        with self.assertRaises(Exception):
+        with self.assertRaises(aiorgwadmin.exceptions.InvalidArgument):
             await self.rgw.get_metadata('bucketttt')
 
     async def test_get_bucket_instances(self):
-        bucket_name = f"bucket-{uuid.uuid4()}"
-        await create_bucket(bucket_name, owner=self.user)
+        bucket_name = unique_id("bucket")
+        await self.create_buckets(bucket_name)
 
-        instances = await self.rgw.get_bucket_instances()
-        bucket = await self.rgw.get_bucket(bucket_name)
+        bucket, instances = await self.rgw.get_bucket_and_instances(bucket_name)
         expected_instance = '%s:%s' % (bucket_name, bucket['id'])
         self.assertTrue(expected_instance in instances)
 
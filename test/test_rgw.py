@@ -2,23 +2,26 @@
 
 import logging
 import unittest
-import uuid
 import random
 
 import aiorgwadmin
-from . import create_bucket, get_environment_creds
+from . import create_bucket, get_environment_creds, require_rgw, unique_id
 
 logging.basicConfig(level=logging.WARNING)
 
 
 class RGWAdminTest(unittest.IsolatedAsyncioTestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        require_rgw()
+
     async def asyncSetUp(self):
-        self.rgw = aiorgwadmin.RGWAdmin(pool_connections=True,
-                                        **get_environment_creds())
-        self.user1 = 'foo1209'
-        self.user2 = 'foo1213'
-        self.user3 = 'bar3142'
+        self.rgw = aiorgwadmin.RGWAdmin(**get_environment_creds())
+        # unique names so that concurrent test workers do not collide
+        self.user1 = unique_id('foo')
+        self.user2 = unique_id('foo')
+        self.user3 = unique_id('bar')
         self.secret = aiorgwadmin.RGWAdmin.gen_secret_key()
         user1 = await self.rgw.create_user(uid=self.user1,
                                            email='%s@example.com' % self.user1,
@@ -74,6 +77,17 @@ class RGWAdminTest(unittest.IsolatedAsyncioTestCase):
                                        display_name='Unit Test %s' % self.user3,
                                        secret_key=aiorgwadmin.RGWAdmin.gen_secret_key())
 
+    async def test_create_user_special_characters(self):
+        email = '%s+tag@example.com' % self.user3
+        display_name = 'Unit Test %s & co' % self.user3
+        user = await self.rgw.create_user(uid=self.user3, email=email,
+                                          display_name=display_name)
+        try:
+            self.assertEqual(user['email'], email)
+            self.assertEqual(user['display_name'], display_name)
+        finally:
+            await self.rgw.remove_user(uid=self.user3, purge_data=True)
+
     async def test_get_user(self):
         user = await self.rgw.get_user(uid=self.user2)
         self.assertTrue(user['display_name'] == 'Unit Test %s' % self.user2)
@@ -98,16 +112,16 @@ class RGWAdminTest(unittest.IsolatedAsyncioTestCase):
 
     async def test_bucket_quota(self):
         size = random.randint(1000, 1000000)
-        bucket_name = f"bucket-{uuid.uuid4()}"
-        await create_bucket(name=bucket_name, owner=self.user1)
+        bucket_name = unique_id("bucket")
+        await create_bucket(name=bucket_name, owner=self.user1, rgw=self.rgw)
         await self.rgw.set_bucket_quota(uid=self.user1, bucket=bucket_name,
                                   max_size_kb=size, enabled=True)
         bucket = await self.rgw.get_bucket(bucket=bucket_name)
         self.assertTrue(bucket['bucket_quota']['max_size_kb'] == size)
 
     async def test_bucket(self):
-        bucket_name = f"bucket-{uuid.uuid4()}"
-        await create_bucket(name=bucket_name, owner=self.user1)
+        bucket_name = unique_id("bucket")
+        await create_bucket(name=bucket_name, owner=self.user1, rgw=self.rgw)
         bucket = await self.rgw.get_bucket(bucket=bucket_name)
         await self.rgw.link_bucket(bucket=bucket_name, bucket_id=bucket['id'],
                                    uid=self.user1)
@@ -144,9 +158,6 @@ class RGWAdminTest(unittest.IsolatedAsyncioTestCase):
             if key['access_key'] == access:
                 self.assertTrue(key['secret_key'] == secret)
 
-    def test_parse_rados_datestring(self):
-        aiorgwadmin.RGWAdmin.parse_rados_datestring(u'2016-06-27T16:06:39.163Z')
-
 
 if __name__ == '__main__':
     unittest.main()
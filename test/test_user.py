@@ -1,55 +1,70 @@
 #!/usr/bin/env python
 
 import logging
-import unittest
-import uuid
 
-import aiorgwadmin
+import pytest
+import pytest_asyncio
+
 from aiorgwadmin.user import RGWUser
-from . import get_environment_creds
+from . import temp_users
 
 logging.basicConfig(level=logging.WARNING)
 
+# display names need not be unique, so every test user shares one
+DISPLAY_NAME = "Unit Test User"
 
-class RGWUserTest(unittest.IsolatedAsyncioTestCase):
+# run every test in the event loop of the session-scoped rgw_admin fixture so
+# its connection pool is reused across tests
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
-    async def asyncSetUp(self):
-        self.rgw = aiorgwadmin.RGWAdmin(**get_environment_creds())
-        aiorgwadmin.RGWAdmin.set_connection(self.rgw)
 
-        self.user = f"user-{uuid.uuid4()}"
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def users(rgw_admin):
+    """
+    Every user of this module paired with the id it was created with, created
+    and deleted in one batch each.
+    """
+    async with temp_users(2, display_name=DISPLAY_NAME) as users:
+        yield list(users.items())
 
-    async def asyncTearDown(self):
-        users = await self.rgw.get_users()
 
-        if self.user in users:
-            await self.rgw.remove_user(uid=self.user, purge_data=True)
+@pytest.fixture
+def shared_user(users):
+    """The user for tests that only read it or restore what they change."""
+    return users[0][1]
 
-    async def test_create_user(self):
-        display_name = f"Test Create User"
-        u = await RGWUser.create(user_id=self.user, display_name=display_name)
-        self.assertTrue(u.user_id == self.user and
-                        u.display_name == display_name)
-        await u.delete()
 
-    async def test_user_exists(self):
-        display_name = "Test User Exists"
-        u = await RGWUser.create(user_id=self.user, display_name=display_name)
-        self.assertTrue(await u.exists())
-        await u.delete()
-        self.assertFalse(await u.exists())
-        await u.save()
-        self.assertTrue(await u.exists())
+@pytest.fixture
+def scratch_user(users):
+    """The user for the one test that deletes and re-creates it."""
+    return users[1][1]
 
-    async def test_set_quota(self):
-        display_name = "Test Set Quota"
-        u = await RGWUser.create(user_id=self.user, display_name=display_name)
-        u.user_quota.size = 1024000
-        await u.save()
-        nu = await RGWUser.fetch(u.user_id)
-        self.assertTrue(u.user_quota.size == nu.user_quota.size)
-        await nu.delete()
+
+async def test_create_user(users):
+    for user_id, u in users:
+        assert u.user_id == user_id
+        assert u.display_name == DISPLAY_NAME
 
 
-if __name__ == '__main__':
-    unittest.main()
+async def test_user_exists(scratch_user):
+    u = scratch_user
+    # temp_users() raises unless create() could fetch the new user back, so
+    # it exists; delete() and save() return nothing, so those need a probe
+    await u.delete()
+    assert not await u.exists()
+    await u.save()
+    assert await u.exists()
+
+
+async def test_set_quota(shared_user):
+    u = shared_user
+    original_size_kb = u.user_quota.max_size_kb
+    u.user_quota.size = 1024000
+    try:
+        await u.save()
+        # compare against the server's copy, not the object we just saved
+        assert (await RGWUser.fetch(u.user_id)).user_quota.size == 1024000
+    finally:
+        # leave the shared user as we found it
+        u.user_quota.max_size_kb = original_size_kb
+        await u.save()